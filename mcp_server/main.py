@@ -1,11 +1,23 @@
+import ast
+import asyncio
 import logging
 import importlib
+import os
 import pkgutil
+import threading
+from functools import lru_cache
 from pathlib import Path
-from typing import Any, Dict, List
+from types import ModuleType
+from typing import Any, Dict, List, Optional
 
+# Imported up front so the async stack's library detection is warm before
+# the first request.
+import anyio  # noqa: F401
+import sniffio  # noqa: F401
 from fastapi import FastAPI, HTTPException
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response
+from fastapi.routing import APIRoute
+from fastapi.concurrency import run_in_threadpool
 from fastapi.openapi.utils import get_openapi
 from pydantic import BaseModel, ValidationError
 
@@ -21,10 +33,18 @@ logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(na
 # ----------------------------------------------------
 # FastAPI Initialization
 # ----------------------------------------------------
+def generate_unique_id(route: APIRoute) -> str:
+    """Short operation IDs (`<tag>_<name>`) to keep the OpenAPI schema compact."""
+    if route.tags:
+        return f"{route.tags[0]}_{route.name}"
+    return route.name
+
+
 app = FastAPI(
     title="CovAIlent MCP Server",
     version="1.0.0",
     description="A central MCP dispatcher for dynamically loaded tools",
+    generate_unique_id_function=generate_unique_id,
 )
 
 # ----------------------------------------------------
@@ -32,34 +52,184 @@ app = FastAPI(
 # ----------------------------------------------------
 _TOOL_REGISTRY: Dict[str, MCPTool] = {}
 
+# Tool name -> module, read from each plugin's `TOOLS` manifest at startup.
+# Modules are only imported the first time one of their tools is needed.
+_TOOL_INDEX: Dict[str, str] = {}
+_TOOL_LOCK = threading.Lock()
+
+# Serialized tool metadata, computed once so /tools never re-walks the
+# Pydantic models. The list holds the compact name/description entries;
+# full schemas are added per tool when its module is loaded.
+_TOOL_METADATA: Dict[str, Dict[str, Any]] = {}
+_TOOL_LIST_CACHE: List[Dict[str, Any]] = []
+
 
-def load_tools() -> None:
+def _read_manifest(source: Path) -> Dict[str, str]:
     """
-    Dynamically discover, load, and register all MCPTool subclasses
-    under the `tools/` package.
+    Statically read a plugin's `TOOLS` list without importing it.
+
+    Returns:
+        A mapping of tool name to description, taken from the string
+        literals assigned to `name`/`description` in the tool classes.
+    """
+    tree = ast.parse(source.read_text(encoding="utf-8"), filename=str(source))
+    tool_names: List[str] = []
+    descriptions: Dict[str, str] = {}
+    for node in tree.body:
+        if isinstance(node, ast.Assign) and any(
+            isinstance(t, ast.Name) and t.id == "TOOLS" for t in node.targets
+        ):
+            tool_names = list(ast.literal_eval(node.value))
+        elif isinstance(node, ast.ClassDef):
+            attrs: Dict[str, Any] = {}
+            for stmt in node.body:
+                if (
+                    isinstance(stmt, ast.Assign)
+                    and len(stmt.targets) == 1
+                    and isinstance(stmt.targets[0], ast.Name)
+                    and isinstance(stmt.value, ast.Constant)
+                ):
+                    attrs[stmt.targets[0].id] = stmt.value.value
+            if isinstance(attrs.get("name"), str):
+                descriptions[attrs["name"]] = attrs.get("description") or ""
+    return {name: descriptions.get(name, "") for name in tool_names}
+
+
+def index_tools() -> None:
+    """
+    Discover all tools under the `tools/` package by reading each module's
+    `TOOLS` manifest. Modules without a manifest are not served.
     """
     for finder, module_name, is_pkg in pkgutil.iter_modules(tools_path):
         full_module = f"tools.{module_name}"
+        source = Path(finder.path) / module_name
+        source = source / "__init__.py" if is_pkg else source.with_suffix(".py")
+        try:
+            manifest = _read_manifest(source)
+        except Exception as e:
+            logger.error(f"Failed to index module '{full_module}': {e}")
+            continue
+        if not manifest:
+            logger.debug(f"Module '{full_module}' declares no TOOLS; skipping.")
+            continue
+        for name, description in manifest.items():
+            if name in _TOOL_INDEX:
+                logger.warning(f"Tool '{name}' is already indexed; skipping duplicate.")
+                continue
+            _TOOL_INDEX[name] = full_module
+            _TOOL_LIST_CACHE.append({"name": name, "description": description})
+            logger.info(f"Indexed tool: {name} ({full_module})")
+
+
+@lru_cache(maxsize=None)
+def _import_tool_module(full_module: str) -> ModuleType:
+    """Import a plugin module at most once per process."""
+    return importlib.import_module(full_module)
+
+
+def load_tool_module(full_module: str) -> None:
+    """Import a plugin module and register the MCPTool subclasses it indexes."""
+    try:
+        module = _import_tool_module(full_module)
+        for attr_name in dir(module):
+            attr = getattr(module, attr_name)
+            if isinstance(attr, type) and issubclass(attr, MCPTool) and attr is not MCPTool:
+                name = getattr(attr, "name", None)
+                if _TOOL_INDEX.get(name) != full_module or name in _TOOL_REGISTRY:
+                    continue
+                tool_instance = attr()
+                _TOOL_REGISTRY[name] = tool_instance
+                _TOOL_METADATA[name] = {
+                    "name": name,
+                    "description": tool_instance.description,
+                    "input_schema": attr.input_schema.model_json_schema(),
+                    "output_schema": attr.output_schema.model_json_schema(),
+                }
+                logger.info(f"Loaded tool: {name}")
+    except Exception as e:
+        logger.error(f"Failed to load module '{full_module}': {e}")
+
+
+def get_tool(tool_name: str) -> Optional[MCPTool]:
+    """Return a registered tool, importing its module on first use."""
+    tool = _TOOL_REGISTRY.get(tool_name)
+    if tool is not None:
+        return tool
+    full_module = _TOOL_INDEX.get(tool_name)
+    if full_module is None:
+        return None
+    with _TOOL_LOCK:
+        if tool_name not in _TOOL_REGISTRY:
+            load_tool_module(full_module)
+    return _TOOL_REGISTRY.get(tool_name)
+
+
+# Heavy tool dependencies imported in the background at startup when
+# COVAILENT_WARMUP=1, so the first tool call does not pay their import cost.
+# Tool modules that run work elsewhere (e.g. docking in a worker process)
+# warm that up through their own `warmup` function.
+_WARMUP_MODULES = ("rdkit.Chem", "rdkit.Chem.AllChem", "httpx", "meeko")
+
+
+def _warmup() -> None:
+    """Import heavy tool dependencies and start tool workers ahead of the first request."""
+    for module_name in _WARMUP_MODULES:
+        try:
+            importlib.import_module(module_name)
+            logger.info(f"Warmed up module: {module_name}")
+        except Exception as e:
+            logger.warning(f"Warmup import of '{module_name}' failed: {e}")
+    for full_module in sorted(set(_TOOL_INDEX.values())):
         try:
-            module = importlib.import_module(full_module)
-            for attr_name in dir(module):
-                attr = getattr(module, attr_name)
-                if isinstance(attr, type) and issubclass(attr, MCPTool) and attr is not MCPTool:
-                    tool_instance = attr()
-                    name = tool_instance.name
-                    if name in _TOOL_REGISTRY:
-                        logger.warning(f"Tool '{name}' is already registered; skipping duplicate.")
-                    else:
-                        _TOOL_REGISTRY[name] = tool_instance
-                        logger.info(f"Loaded tool: {name}")
+            module_warmup = getattr(_import_tool_module(full_module), "warmup", None)
+            if module_warmup is not None:
+                module_warmup()
+                logger.info(f"Warmed up tool module: {full_module}")
         except Exception as e:
-            logger.error(f"Failed to load module '{full_module}': {e}")
+            logger.warning(f"Warmup of '{full_module}' failed: {e}")
+
+
+@app.on_event("shutdown")
+async def shutdown_event() -> None:
+    """
+    FastAPI shutdown handler to let loaded tools release their resources.
+    Resources shared by a module's tools are released once, through the
+    module's own `aclose` coroutine if it defines one.
+    """
+    for name, tool in list(_TOOL_REGISTRY.items()):
+        try:
+            await tool.aclose()
+        except Exception as e:
+            logger.error(f"Failed to close tool '{name}': {e}")
+    for full_module in sorted({_TOOL_INDEX[name] for name in _TOOL_REGISTRY}):
+        module_aclose = getattr(_import_tool_module(full_module), "aclose", None)
+        if module_aclose is None:
+            continue
+        try:
+            await module_aclose()
+        except Exception as e:
+            logger.error(f"Failed to close module '{full_module}': {e}")
+
+
+def _missing_tool_error(tool_name: str) -> HTTPException:
+    """Error for a tool that is not registered: unknown (404) or failed to load (503)."""
+    if tool_name in _TOOL_INDEX:
+        logger.error(f"Tool '{tool_name}' is indexed but its module failed to load.")
+        return HTTPException(status_code=503, detail=f"Tool '{tool_name}' is unavailable: failed to load.")
+    logger.error(f"Tool '{tool_name}' not found in registry.")
+    return HTTPException(status_code=404, detail=f"Tool '{tool_name}' not found.")
 
 
 @app.on_event("startup")
 async def startup_event() -> None:
-    """FastAPI startup handler to populate tool registry."""
-    load_tools()
+    """
+    FastAPI startup handler to index available tools, warm the OpenAPI
+    schema and, if enabled, start warming tool dependencies in a thread.
+    """
+    index_tools()
+    app.openapi()
+    if os.environ.get("COVAILENT_WARMUP") == "1":
+        asyncio.get_running_loop().run_in_executor(None, _warmup)
 
 
 # ----------------------------------------------------
@@ -68,6 +238,9 @@ async def startup_event() -> None:
 class ToolListItem(BaseModel):
     name: str
     description: str
+
+
+class ToolDetail(ToolListItem):
     input_schema: Dict[str, Any]
     output_schema: Dict[str, Any]
 
@@ -75,58 +248,81 @@ class ToolListItem(BaseModel):
 # ----------------------------------------------------
 # API Endpoints
 # ----------------------------------------------------
-@app.get("/tools", response_model=List[ToolListItem], summary="List all registered MCP tools")
-def list_tools() -> List[ToolListItem]:
-    """Return metadata for all registered tools."""
-    return [
-        ToolListItem(
-            name=tool.name,
-            description=tool.description,
-            input_schema=tool.input_schema.schema(),
-            output_schema=tool.output_schema.schema(),
-        )
-        for tool in _TOOL_REGISTRY.values()
-    ]
-
-
-@app.post("/tools/{tool_name}/run", summary="Invoke a specific tool by name")
-async def run_tool(tool_name: str, payload: Dict[str, Any]) -> JSONResponse:
+@app.get(
+    "/tools",
+    response_model=List[ToolListItem],
+    tags=["tools"],
+    summary="List all available MCP tools",
+)
+def list_tools() -> JSONResponse:
+    """
+    Return the name and description of every indexed tool.
+
+    The list is prebuilt in `index_tools`; returning a response directly
+    skips `response_model` re-validation (the model is kept for the docs).
+    Use `/tools/{tool_name}` for a tool's input and output schemas.
+    """
+    return JSONResponse(content=_TOOL_LIST_CACHE)
+
+
+@app.get(
+    "/tools/{tool_name}",
+    response_model=ToolDetail,
+    tags=["tools"],
+    summary="Describe a specific tool by name",
+)
+def describe_tool(tool_name: str) -> JSONResponse:
+    """Return the full metadata, including JSON schemas, for a single tool."""
+    tool = get_tool(tool_name)
+    if not tool:
+        raise _missing_tool_error(tool_name)
+    return JSONResponse(content=_TOOL_METADATA[tool_name])
+
+
+@app.post("/tools/{tool_name}/run", tags=["tools"], summary="Invoke a specific tool by name")
+async def run_tool(tool_name: str, payload: Dict[str, Any]) -> Response:
     """
     Validate input against the tool's Pydantic schema, execute the tool,
     validate output, and return JSON response.
+
+    Validation goes through the tool's prebuilt TypeAdapters rather than
+    constructing the models directly, and the response body is encoded
+    straight to JSON bytes by pydantic-core.
     """
     tool = _TOOL_REGISTRY.get(tool_name)
+    if tool is None:
+        # First use imports the tool's module; keep that off the event loop
+        tool = await run_in_threadpool(get_tool, tool_name)
     if not tool:
-        logger.error(f"Tool '{tool_name}' not found in registry.")
-        raise HTTPException(status_code=404, detail=f"Tool '{tool_name}' not found.")
+        raise _missing_tool_error(tool_name)
 
     try:
-        validated_input = tool.input_schema(**payload)
+        validated_input = tool._input_validator.validate_python(payload)
     except ValidationError as ve:
         logger.error(f"Input validation failed for '{tool_name}': {ve}")
-        raise HTTPException(status_code=422, detail=ve.errors())
+        raise HTTPException(status_code=422, detail=ve.errors(include_url=False, include_context=False))
 
     try:
-        raw_output = tool.run(validated_input)
+        raw_output = await tool.arun(validated_input)
     except Exception as e:
         logger.exception(f"Execution error in tool '{tool_name}': {e}")
         raise HTTPException(status_code=500, detail=f"Error executing tool '{tool_name}': {e}")
 
     try:
-        validated_output = tool.output_schema(**raw_output)
+        validated_output = tool._output_validator.validate_python(raw_output if raw_output is not None else {})
     except ValidationError as ve:
         logger.error(f"Output validation failed for '{tool_name}': {ve}")
         raise HTTPException(status_code=500, detail=f"Invalid output from tool '{tool_name}'.")
 
-    return JSONResponse(content=validated_output.dict())
+    body = tool._output_validator.dump_json(validated_output)
+    return Response(content=body, media_type="application/json", status_code=200)
 
 
 # ----------------------------------------------------
 # Custom OpenAPI Schema
 # ----------------------------------------------------
+@lru_cache(maxsize=1)
 def custom_openapi() -> Dict[str, Any]:
-    if app.openapi_schema:
-        return app.openapi_schema
     openapi_schema = get_openapi(
         title=app.title,
         version=app.version,
@@ -1,29 +1,60 @@
+import json
 import logging
-from abc import ABC, abstractmethod
+from abc import ABC
+from functools import lru_cache
 from typing import Any, Dict, Type
 
 import jsonschema
-from pydantic import BaseModel
+from jsonschema import Draft202012Validator
+from jsonschema.protocols import Validator
+from pydantic import BaseModel, TypeAdapter
+from starlette.concurrency import run_in_threadpool
 
 logger = logging.getLogger(__name__)
 logging.basicConfig(level=logging.INFO)
 
 
-def validate_json_schema(schema: Dict[str, Any], data: Any) -> None:
+@lru_cache(maxsize=128)
+def _compiled_validator(schema_json: str) -> Validator:
     """
-    Validate a Python data structure against a JSON schema.
-
-    Raises:
-        jsonschema.ValidationError: if data does not conform to schema.
+    Check and compile a JSON schema (given as canonical JSON text), returning
+    a validator that is reused for later calls. Only the most recently used
+    schemas are kept, since callers may pass arbitrary dynamic schemas.
     """
+    schema = json.loads(schema_json)
+    validator_cls = jsonschema.validators.validator_for(schema, default=Draft202012Validator)
+    validator_cls.check_schema(schema)
+    return validator_cls(schema)
+
+
+@lru_cache(maxsize=None)
+def _model_schema_json(schema_model: Type[BaseModel]) -> str:
+    """Canonical JSON text of a Pydantic model's schema, generated once per model."""
+    return json.dumps(schema_model.model_json_schema(), sort_keys=True)
+
+
+def _validate_with(validator: Validator, data: Any) -> None:
+    """Raise the most relevant error, as `jsonschema.validate` does."""
     try:
-        jsonschema.validate(instance=data, schema=schema)
+        error = jsonschema.exceptions.best_match(validator.iter_errors(data))
+        if error is not None:
+            raise error
         logger.debug("JSON schema validation passed.")
     except jsonschema.ValidationError as e:
         logger.error(f"JSON schema validation error: {e.message}")
         raise
 
 
+def validate_json_schema(schema: Dict[str, Any], data: Any) -> None:
+    """
+    Validate a Python data structure against a JSON schema.
+
+    Raises:
+        jsonschema.ValidationError: if data does not conform to schema.
+    """
+    _validate_with(_compiled_validator(json.dumps(schema, sort_keys=True)), data)
+
+
 class MCPTool(ABC):
     """
     Abstract base class for Model Context Protocol (MCP) tools.
@@ -33,6 +64,12 @@ class MCPTool(ABC):
         description: Brief description of the tool's purpose.
         input_schema: Pydantic model class defining the input schema.
         output_schema: Pydantic model class defining the output schema.
+
+    Each instance builds a TypeAdapter for both schemas once, so the server
+    can validate and serialize without rebuilding them per request.
+
+    Tools implement either `run` (blocking work, executed in a threadpool)
+    or `arun` (I/O-bound work awaited on the event loop).
     """
 
     name: str
@@ -50,44 +87,12 @@ class MCPTool(ABC):
             raise TypeError("'input_schema' must be a Pydantic BaseModel subclass.")
         if not isinstance(self.output_schema, type) or not issubclass(self.output_schema, BaseModel):
             raise TypeError("'output_schema' must be a Pydantic BaseModel subclass.")
+        if type(self).run is MCPTool.run and type(self).arun is MCPTool.arun:
+            raise TypeError("Tool must implement 'run' or 'arun'.")
+        self._input_validator: TypeAdapter = TypeAdapter(self.input_schema)
+        self._output_validator: TypeAdapter = TypeAdapter(self.output_schema)
         logger.info(f"Initialized MCPTool: {self.name}")
 
-    def parse_input(self, data: Dict[str, Any]) -> BaseModel:
-        """
-        Parse and validate raw input data into a Pydantic model.
-
-        Returns:
-            An instance of input_schema.
-
-        Raises:
-            pydantic.ValidationError: if data is invalid.
-        """
-        try:
-            validated = self.input_schema(**data)
-            logger.debug(f"Input parsed successfully for tool '{self.name}'.")
-            return validated
-        except Exception as e:
-            logger.error(f"Error parsing input for '{self.name}': {e}")
-            raise
-
-    def format_output(self, data: Any) -> Dict[str, Any]:
-        """
-        Validate and serialize output data using Pydantic.
-
-        Returns:
-            A JSON-serializable dict.
-
-        Raises:
-            pydantic.ValidationError: if output data is invalid.
-        """
-        try:
-            model = self.output_schema(**(data or {}))
-            logger.debug(f"Output formatted successfully for tool '{self.name}'.")
-            return model.dict()
-        except Exception as e:
-            logger.error(f"Error formatting output for '{self.name}': {e}")
-            raise
-
     @classmethod
     def validate_json(cls, data: Any, schema_model: Type[BaseModel]) -> None:
         """
@@ -100,13 +105,11 @@ class MCPTool(ABC):
         Raises:
             jsonschema.ValidationError: if data does not conform to the schema.
         """
-        json_schema = schema_model.schema()
-        validate_json_schema(json_schema, data)
+        _validate_with(_compiled_validator(_model_schema_json(schema_model)), data)
 
-    @abstractmethod
     def run(self, input_data: BaseModel) -> Dict[str, Any]:
         """
-        Execute the tool's main logic.
+        Execute the tool's main logic synchronously.
 
         Args:
             input_data: Validated input as a Pydantic model.
@@ -114,4 +117,22 @@ class MCPTool(ABC):
         Returns:
             A dict containing output data compatible with output_schema.
         """
-        pass
\ No newline at end of file
+        raise NotImplementedError(f"Tool '{self.name}' does not implement 'run'.")
+
+    async def arun(self, input_data: BaseModel) -> Dict[str, Any]:
+        """
+        Execute the tool's main logic without blocking the event loop.
+
+        The default runs `run` in a worker thread; I/O-bound tools override
+        this with a native coroutine.
+
+        Args:
+            input_data: Validated input as a Pydantic model.
+
+        Returns:
+            A dict containing output data compatible with output_schema.
+        """
+        return await run_in_threadpool(self.run, input_data)
+
+    async def aclose(self) -> None:
+        """Release resources held by the tool (e.g. network clients) at server shutdown."""
@@ -1,8 +1,11 @@
+import asyncio
 import logging
 from typing import List, Dict, Any, Optional
 
-import requests
-from pydantic import BaseModel, Field, validator
+import httpx
+import orjson
+from cachetools import LRUCache, TTLCache
+from pydantic import BaseModel, Field
 
 from tool_schema import MCPTool
 
@@ -12,6 +15,78 @@ logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(na
 
 CHEMBL_BASE_URL = "https://www.ebi.ac.uk/chembl/api/data"
 
+# Tools served from this module (read by the server without importing it)
+TOOLS = ["fetch_compound_by_name", "get_activity_data_for_target"]
+
+# Shared async client so calls reuse pooled keep-alive connections to ChEMBL
+# without blocking the event loop. Connection failures are retried by the
+# transport; 429/5xx responses are retried with backoff by _get, and the
+# final response is handled by the tools themselves. The client is created on
+# first use and again after the server's shutdown hook has closed it.
+_CLIENT: Optional[httpx.AsyncClient] = None
+_RETRY_STATUSES = frozenset({429, 502, 503, 504})
+_MAX_RETRIES = 3
+_BACKOFF_FACTOR = 0.2
+
+
+def _client() -> httpx.AsyncClient:
+    """Return the shared client, (re)creating it if it is missing or closed."""
+    global _CLIENT
+    if _CLIENT is None or _CLIENT.is_closed:
+        _CLIENT = httpx.AsyncClient(
+            timeout=10.0,
+            headers={'Accept': 'application/json'},
+            transport=httpx.AsyncHTTPTransport(
+                retries=3,
+                limits=httpx.Limits(max_connections=32, max_keepalive_connections=16),
+            ),
+        )
+    return _CLIENT
+
+
+async def aclose() -> None:
+    """Close the shared client; called once by the server on shutdown."""
+    global _CLIENT
+    client, _CLIENT = _CLIENT, None
+    if client is not None:
+        await client.aclose()
+
+
+async def _get(url: str) -> httpx.Response:
+    """GET a ChEMBL URL, retrying retryable statuses with exponential backoff."""
+    client = _client()
+    for attempt in range(_MAX_RETRIES):
+        response = await client.get(url)
+        if response.status_code not in _RETRY_STATUSES:
+            return response
+        await asyncio.sleep(_BACKOFF_FACTOR * (2 ** attempt))
+    return await client.get(url)
+
+# ChEMBL records change rarely: fresh results are served from the TTL caches
+# without touching the network, and the last good result for a key is kept
+# in the stale caches to answer when ChEMBL rate-limits, errors or times out.
+_COMPOUND_CACHE: TTLCache = TTLCache(maxsize=4096, ttl=3600)
+_COMPOUND_STALE: LRUCache = LRUCache(maxsize=4096)
+_ACTIVITY_CACHE: TTLCache = TTLCache(maxsize=1024, ttl=3600)
+_ACTIVITY_STALE: LRUCache = LRUCache(maxsize=1024)
+
+
+def _remember(cache: TTLCache, stale: LRUCache, key: str, output: Dict[str, Any]) -> None:
+    """Store a successful result (without its logs) in the fresh and stale caches."""
+    result = {k: v for k, v in output.items() if k != 'logs'}
+    cache[key] = result
+    stale[key] = result
+
+
+def _serve_stale(stale: LRUCache, key: str, logs: List[str]) -> Optional[Dict[str, Any]]:
+    """Return the last good result for key with the current logs, if one exists."""
+    result = stale.get(key)
+    if result is None:
+        return None
+    logs.append(f"ChEMBL unavailable; serving last known result for '{key}'.")
+    logger.warning(f"Serving stale ChEMBL result for '{key}'.")
+    return {**result, 'logs': logs}
+
 
 class FetchCompoundByNameInput(BaseModel):
     name: str = Field(..., description="Preferred compound name or synonym.")
@@ -32,22 +107,26 @@ class FetchCompoundByNameTool(MCPTool):
     input_schema = FetchCompoundByNameInput
     output_schema = FetchCompoundByNameOutput
 
-    def run(self, input_data: FetchCompoundByNameInput) -> Dict[str, Any]:
+    async def arun(self, input_data: FetchCompoundByNameInput) -> Dict[str, Any]:
         logs: List[str] = []
+        cached = _COMPOUND_CACHE.get(input_data.name)
+        if cached is not None:
+            logs.append(f"Served cached ChEMBL result for name: {input_data.name}.")
+            return {**cached, 'logs': logs}
         try:
             search_url = f"{CHEMBL_BASE_URL}/molecule/search/{input_data.name}.json?limit=1"
             logs.append(f"Querying ChEMBL molecule search endpoint: {search_url}")
-            response = requests.get(search_url, timeout=10)
+            response = await _get(search_url)
 
             if response.status_code == 404:
                 logs.append(f"No compound found for name: {input_data.name} (404).")
                 return {**{}, 'logs': logs}
             if response.status_code == 429:
                 logs.append("Rate limit exceeded when querying compound by name.")
-                return {**{}, 'logs': logs}
+                return _serve_stale(_COMPOUND_STALE, input_data.name, logs) or {**{}, 'logs': logs}
 
             response.raise_for_status()
-            data = response.json()
+            data = orjson.loads(response.content)
             molecules = data.get('molecules') or data.get('molecule') or []
             if not molecules:
                 logs.append(f"No results returned for name: {input_data.name}.")
@@ -64,13 +143,14 @@ class FetchCompoundByNameTool(MCPTool):
                 'molecular_weight': float(mol.get('molecular_weight') or 0.0),
                 'logs': logs
             }
+            _remember(_COMPOUND_CACHE, _COMPOUND_STALE, input_data.name, output)
             return output
 
-        except requests.exceptions.RequestException as e:
+        except httpx.HTTPError as e:
             errmsg = f"HTTP error during ChEMBL fetch: {e}"
             logger.exception(errmsg)
             logs.append(errmsg)
-            return {**{}, 'logs': logs}
+            return _serve_stale(_COMPOUND_STALE, input_data.name, logs) or {**{}, 'logs': logs}
         except Exception as e:
             errmsg = f"Unexpected error in fetch_compound_by_name: {e}"
             logger.exception(errmsg)
@@ -96,27 +176,36 @@ class GetActivityDataForTargetOutput(BaseModel):
     logs: List[str] = Field(..., description="Logs detailing the activity fetch process.")
 
 
+# ChEMBL activity fields and the ActivityRecord fields they map onto
+_ACTIVITY_SOURCE_KEYS = ('molecule_chembl_id', 'standard_type', 'standard_value', 'standard_units', 'pchembl_value')
+_ACTIVITY_RECORD_KEYS = ('compound_chembl_id', 'standard_type', 'standard_value', 'standard_units', 'pchembl_value')
+
+
 class GetActivityDataForTargetTool(MCPTool):
     name = "get_activity_data_for_target"
     description = "Fetch bioactivity data from ChEMBL for a given UniProt ID."
     input_schema = GetActivityDataForTargetInput
     output_schema = GetActivityDataForTargetOutput
 
-    def run(self, input_data: GetActivityDataForTargetInput) -> Dict[str, Any]:
+    async def arun(self, input_data: GetActivityDataForTargetInput) -> Dict[str, Any]:
         logs: List[str] = []
+        cached = _ACTIVITY_CACHE.get(input_data.uniprot_id)
+        if cached is not None:
+            logs.append(f"Served cached ChEMBL result for UniProt ID: {input_data.uniprot_id}.")
+            return {**cached, 'logs': logs}
         try:
             # Step 1: map UniProt ID to target_chembl_id
             target_search = f"{CHEMBL_BASE_URL}/target/search/{input_data.uniprot_id}.json?limit=1"
             logs.append(f"Querying ChEMBL target search endpoint: {target_search}")
-            resp_t = requests.get(target_search, timeout=10)
+            resp_t = await _get(target_search)
             if resp_t.status_code == 404:
                 logs.append(f"No target found for UniProt ID: {input_data.uniprot_id} (404).")
                 return {'activities': [], 'logs': logs}
             if resp_t.status_code == 429:
                 logs.append("Rate limit exceeded when querying target.")
-                return {'activities': [], 'logs': logs}
+                return _serve_stale(_ACTIVITY_STALE, input_data.uniprot_id, logs) or {'activities': [], 'logs': logs}
             resp_t.raise_for_status()
-            target_data = resp_t.json().get('targets') or []
+            target_data = orjson.loads(resp_t.content).get('targets') or []
             if not target_data:
                 logs.append(f"No targets returned for UniProt ID: {input_data.uniprot_id}.")
                 return {'activities': [], 'logs': logs}
@@ -126,34 +215,33 @@ class GetActivityDataForTargetTool(MCPTool):
             # Step 2: fetch activities for this target
             activity_url = f"{CHEMBL_BASE_URL}/activity.json?target_chembl_id={target_chembl}&limit=50"
             logs.append(f"Querying ChEMBL activity endpoint: {activity_url}")
-            resp_a = requests.get(activity_url, timeout=10)
+            resp_a = await _get(activity_url)
             if resp_a.status_code == 404:
                 logs.append(f"No activity data for target {target_chembl} (404).")
                 return {'target_chembl_id': target_chembl, 'activities': [], 'logs': logs}
             if resp_a.status_code == 429:
                 logs.append("Rate limit exceeded when querying activities.")
-                return {'target_chembl_id': target_chembl, 'activities': [], 'logs': logs}
+                return (
+                    _serve_stale(_ACTIVITY_STALE, input_data.uniprot_id, logs)
+                    or {'target_chembl_id': target_chembl, 'activities': [], 'logs': logs}
+                )
             resp_a.raise_for_status()
-            act_data = resp_a.json().get('activities') or []
-
-            activities: List[Dict[str, Any]] = []
-            for rec in act_data:
-                activities.append({
-                    'compound_chembl_id': rec.get('molecule_chembl_id'),
-                    'standard_type': rec.get('standard_type'),
-                    'standard_value': rec.get('standard_value'),
-                    'standard_units': rec.get('standard_units'),
-                    'pchembl_value': rec.get('pchembl_value')
-                })
+            act_data = orjson.loads(resp_a.content).get('activities') or []
+
+            activities: List[Dict[str, Any]] = [
+                dict(zip(_ACTIVITY_RECORD_KEYS, map(rec.get, _ACTIVITY_SOURCE_KEYS))) for rec in act_data
+            ]
             logs.append(f"Retrieved {len(activities)} activity records for target {target_chembl}.")
 
-            return {'target_chembl_id': target_chembl, 'activities': activities, 'logs': logs}
+            output = {'target_chembl_id': target_chembl, 'activities': activities, 'logs': logs}
+            _remember(_ACTIVITY_CACHE, _ACTIVITY_STALE, input_data.uniprot_id, output)
+            return output
 
-        except requests.exceptions.RequestException as e:
+        except httpx.HTTPError as e:
             errmsg = f"HTTP error during activity fetch: {e}"
             logger.exception(errmsg)
             logs.append(errmsg)
-            return {'activities': [], 'logs': logs}
+            return _serve_stale(_ACTIVITY_STALE, input_data.uniprot_id, logs) or {'activities': [], 'logs': logs}
         except Exception as e:
             errmsg = f"Unexpected error in get_activity_data_for_target: {e}"
             logger.exception(errmsg)
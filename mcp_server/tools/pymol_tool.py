@@ -2,9 +2,9 @@ import logging
 import subprocess
 import tempfile
 from pathlib import Path
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
 
-from pydantic import BaseModel, Field, validator
+from pydantic import BaseModel, Field, field_validator
 
 from tool_schema import MCPTool
 
@@ -15,16 +15,17 @@ logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(na
 class DockLigandInput(BaseModel):
     ligand_smiles: str = Field(..., description="Ligand structure in SMILES format")
     receptor_pdb_path: str = Field(..., description="Path to the target protein PDB file")
-    center_x: float = Field(None, description="X coordinate of docking box center")
-    center_y: float = Field(None, description="Y coordinate of docking box center")
-    center_z: float = Field(None, description="Z coordinate of docking box center")
+    center_x: Optional[float] = Field(None, description="X coordinate of docking box center")
+    center_y: Optional[float] = Field(None, description="Y coordinate of docking box center")
+    center_z: Optional[float] = Field(None, description="Z coordinate of docking box center")
     size_x: float = Field(20.0, description="Size of docking box along X axis")
     size_y: float = Field(20.0, description="Size of docking box along Y axis")
     size_z: float = Field(20.0, description="Size of docking box along Z axis")
     exhaustiveness: int = Field(8, description="Exhaustiveness of the global search (higher is slower)")
     num_modes: int = Field(9, description="Maximum number of binding modes to generate")
 
-    @validator('receptor_pdb_path')
+    @field_validator('receptor_pdb_path')
+    @classmethod
     def check_receptor_exists(cls, v: str) -> str:
         if not Path(v).exists():
             raise ValueError(f"Receptor file not found: {v}")
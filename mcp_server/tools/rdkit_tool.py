@@ -1,7 +1,8 @@
 import logging
-from typing import List, Dict, Any
+from functools import lru_cache
+from typing import List, Dict, Any, Optional
 
-from rdkit import Chem
+from rdkit import Chem, rdBase
 from rdkit.Chem import AllChem
 
 from tool_schema import MCPTool
@@ -11,6 +12,15 @@ from pydantic import BaseModel, Field
 logger = logging.getLogger(__name__)
 logging.basicConfig(level=logging.INFO)
 
+# Tools served from this module (read by the server without importing it)
+TOOLS = ["mutate_ligand", "optimize_molecule"]
+
+
+@lru_cache(maxsize=1024)
+def _parse_smiles(smiles: str) -> Optional[Chem.Mol]:
+    """Parse a SMILES string, memoized for repeated inputs. The returned Mol is shared; do not modify it."""
+    return Chem.MolFromSmiles(smiles)
+
 
 class MutateLigandInput(BaseModel):
     smiles: str = Field(..., description="Original molecule in SMILES format")
@@ -29,23 +39,26 @@ class MutateLigandTool(MCPTool):
     output_schema = MutateLigandOutput
 
     def run(self, input_data: MutateLigandInput) -> Dict[str, Any]:
+        # Mute RDKit's own logger for this call only; failures are reported through the tool logs
+        block_logs = rdBase.BlockLogs()  # noqa: F841
         logs: List[str] = []
         try:
             logs.append(f"Parsing input SMILES: {input_data.smiles}")
-            mol = Chem.MolFromSmiles(input_data.smiles)
+            mol = _parse_smiles(input_data.smiles)
             if mol is None:
                 logs.append("Error: could not parse SMILES into RDKit Mol object.")
                 return {"modified_smiles": "", "logs": logs}
             logs.append("Successfully parsed SMILES to RDKit Mol.")
 
+            if not input_data.modification.strip():
+                logs.append("No modification requested; returning original molecule.")
+                return {"modified_smiles": input_data.smiles, "logs": logs}
+
             # Placeholder for real modification logic
             logs.append(f"Requested modification: '{input_data.modification}'")
             logs.append("Mutation logic not implemented; returning original molecule.")
 
-            modified_smiles = Chem.MolToSmiles(mol)
-            logs.append(f"Resulting SMILES: {modified_smiles}")
-
-            return {"modified_smiles": modified_smiles, "logs": logs}
+            return {"modified_smiles": input_data.smiles, "logs": logs}
         except Exception as e:
             errmsg = f"Exception during mutation: {e}"
             logger.exception(errmsg)
@@ -56,11 +69,14 @@ class MutateLigandTool(MCPTool):
 class OptimizeMoleculeInput(BaseModel):
     smiles: str = Field(..., description="Molecule in SMILES format to optimize")
     max_iterations: int = Field(200, description="Maximum iterations for force field optimization")
+    num_conformers: int = Field(
+        1, ge=1, le=50, description="Number of conformers to embed and optimize in parallel; the lowest-energy one is kept"
+    )
 
 
 class OptimizeMoleculeOutput(BaseModel):
     optimized_smiles: str = Field(..., description="SMILES of the optimized molecule (connectivity unchanged)")
-    energy: float = Field(..., description="Final force-field energy after optimization")
+    energy: float = Field(..., description="Final force-field energy of the lowest-energy conformer")
     logs: List[str] = Field(..., description="Step-by-step logs of the optimization process")
 
 
@@ -71,10 +87,12 @@ class OptimizeMoleculeTool(MCPTool):
     output_schema = OptimizeMoleculeOutput
 
     def run(self, input_data: OptimizeMoleculeInput) -> Dict[str, Any]:
+        # Mute RDKit's own logger for this call only; failures are reported through the tool logs
+        block_logs = rdBase.BlockLogs()  # noqa: F841
         logs: List[str] = []
         try:
             logs.append(f"Parsing input SMILES: {input_data.smiles}")
-            mol = Chem.MolFromSmiles(input_data.smiles)
+            mol = _parse_smiles(input_data.smiles)
             if mol is None:
                 logs.append("Error: invalid SMILES, cannot parse.")
                 return {"optimized_smiles": "", "energy": 0.0, "logs": logs}
@@ -84,28 +102,36 @@ class OptimizeMoleculeTool(MCPTool):
             mol_h = Chem.AddHs(mol)
             logs.append("Added explicit hydrogens.")
 
-            embed_status = AllChem.EmbedMolecule(mol_h)
-            if embed_status != 0:
-                logs.append(f"Warning: embedding returned status {embed_status}.")
-            else:
-                logs.append("3D coordinates successfully embedded.")
+            # ETKDGv3 with random starting coordinates needs fewer embedding restarts;
+            # numThreads=0 lets RDKit embed and optimize conformers on all cores.
+            params = AllChem.ETKDGv3()
+            params.useRandomCoords = True
+            params.numThreads = 0
+            conf_ids = list(AllChem.EmbedMultipleConfs(mol_h, numConfs=input_data.num_conformers, params=params))
+            if not conf_ids:
+                logs.append("Error: failed to embed 3D coordinates.")
+                return {"optimized_smiles": "", "energy": 0.0, "logs": logs}
+            logs.append(f"Embedded {len(conf_ids)} conformer(s) in 3D.")
 
-            # Optimize with UFF, fallback to MMFF
-            try:
-                ff = AllChem.UFFGetMoleculeForceField(mol_h)
+            # Optimize with UFF, or MMFF when UFF lacks parameters for some atoms
+            if AllChem.UFFHasAllMoleculeParams(mol_h):
                 logs.append("Using UFF force field.")
-            except Exception:
-                ff = AllChem.MMFFOptimizeMolecule(mol_h, maxIters=input_data.max_iterations)
+                results = AllChem.UFFOptimizeMoleculeConfs(
+                    mol_h, numThreads=0, maxIters=input_data.max_iterations
+                )
+            elif AllChem.MMFFHasAllMoleculeParams(mol_h):
                 logs.append("Using MMFF as fallback.")
-
-            if hasattr(ff, 'CalcEnergy'):
-                ff.Minimize(maxIts=input_data.max_iterations)
-                energy = ff.CalcEnergy()
-                logs.append("Force field minimization complete.")
+                results = AllChem.MMFFOptimizeMoleculeConfs(
+                    mol_h, numThreads=0, maxIters=input_data.max_iterations
+                )
             else:
-                # In case ff is an int from MMFFOptimizeMolecule
-                energy = float(ff)
-                logs.append("Force field minimization complete (MMFF).")
+                logs.append("Error: no force field parameters available for this molecule.")
+                return {"optimized_smiles": "", "energy": 0.0, "logs": logs}
+
+            # results holds one (not_converged, energy) pair per conformer
+            best = min(range(len(results)), key=lambda i: results[i][1])
+            energy = results[best][1]
+            logs.append(f"Force field minimization complete; lowest energy conformer: {conf_ids[best]}.")
 
             optimized_smiles = Chem.MolToSmiles(Chem.RemoveHs(mol_h))
             logs.append(f"Optimized molecule SMILES: {optimized_smiles}")
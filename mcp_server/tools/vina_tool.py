@@ -1,30 +1,185 @@
+import atexit
+import hashlib
 import logging
+import multiprocessing
+import os
+import re
+import shutil
 import subprocess
 import tempfile
+import threading
+import uuid
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from pathlib import Path
-from typing import Dict, Any, List
+from typing import Deque, Dict, Any, List, Literal, Optional
 
-from pydantic import BaseModel, Field, validator
+from meeko import MoleculePreparation, PDBQTWriterLegacy
+from pydantic import BaseModel, Field, field_validator
+from rdkit import Chem
+from rdkit.Chem import AllChem
+from vina import Vina
 
 from tool_schema import MCPTool
 
 logger = logging.getLogger(__name__)
 logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(name)s: %(message)s")
 
+# Tools served from this module (read by the server without importing it)
+TOOLS = ["dock_ligand"]
+
+# Prepared receptors are reused across docking runs against the same PDB file
+RECEPTOR_CACHE_DIR = Path.home() / ".cache" / "covailent"
+
+# Per-run working directories live under a single per-process root, on
+# RAM-backed /dev/shm when available, which is removed at exit. They hold the
+# returned pose files, so only the MAX_KEPT_RUNS most recently finished runs
+# are kept; runs still queued or docking are never evicted.
+SCRATCH_DIR = "/dev/shm" if Path("/dev/shm").is_dir() else None
+MAX_KEPT_RUNS = 32
+_WORK_ROOT: Optional[Path] = None
+_WORK_DIRS: Deque[Path] = deque()
+_WORK_LOCK = threading.Lock()
+
+# Only the tail of the docking engine's stdout (the score table) is kept in the logs
+STDOUT_LOG_LINES = 20
+
+# Affinity of mode 1 in the Vina-style score table printed to stdout
+_SCORE_RE = re.compile(r"^\s*1\s+(-?\d+\.\d+)", re.M)
+
+# Vina's SWIG bindings hold the GIL for the whole search, so docking runs in a
+# worker process to keep the server responsive. One worker is enough since
+# each search already uses every core.
+_VINA_POOL: Optional[ProcessPoolExecutor] = None
+_VINA_POOL_LOCK = threading.Lock()
+
+
+def _vina_pool() -> ProcessPoolExecutor:
+    """Return the docking worker pool, (re)creating it on first use or after a crash."""
+    global _VINA_POOL
+    with _VINA_POOL_LOCK:
+        if _VINA_POOL is None:
+            _VINA_POOL = ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn"))
+        return _VINA_POOL
+
+
+def _discard_vina_pool() -> None:
+    global _VINA_POOL
+    with _VINA_POOL_LOCK:
+        _VINA_POOL = None
+
+
+def _worker_ready() -> bool:
+    """Worker-process no-op; running it imports this module, and Vina, in the worker."""
+    return True
+
+
+def warmup() -> None:
+    """Start the docking worker and load its imports ahead of the first dock."""
+    _vina_pool().submit(_worker_ready).result()
+
+
+def _run_vina(
+    receptor_pdbqt: str,
+    ligand_pdbqt: str,
+    center: List[float],
+    box_size: List[float],
+    exhaustiveness: int,
+    num_modes: int,
+    out_poses: str,
+    cpu: int,
+) -> float:
+    """Worker-process entry point: dock one ligand with the Vina bindings and return the top affinity."""
+    v = Vina(sf_name="vina", cpu=cpu, verbosity=0)
+    v.set_receptor(receptor_pdbqt)
+    v.set_ligand_from_string(ligand_pdbqt)
+    v.compute_vina_maps(center=center, box_size=box_size)
+    v.dock(exhaustiveness=exhaustiveness, n_poses=num_modes)
+    v.write_poses(out_poses, n_poses=num_modes, overwrite=True)
+    return float(v.energies(n_poses=1)[0][0])
+
+
+def _new_workdir() -> Path:
+    """Create a per-run working directory under the per-process root."""
+    global _WORK_ROOT
+    with _WORK_LOCK:
+        if _WORK_ROOT is None:
+            _WORK_ROOT = Path(tempfile.mkdtemp(prefix="covailent_", dir=SCRATCH_DIR))
+            atexit.register(shutil.rmtree, _WORK_ROOT, ignore_errors=True)
+        return Path(tempfile.mkdtemp(prefix="vina_", dir=_WORK_ROOT))
+
+
+def _retire_workdir(workdir: Path) -> None:
+    """Record a finished run's directory, evicting the oldest finished runs beyond MAX_KEPT_RUNS."""
+    with _WORK_LOCK:
+        _WORK_DIRS.append(workdir)
+        while len(_WORK_DIRS) > MAX_KEPT_RUNS:
+            evicted = _WORK_DIRS.popleft()
+            shutil.rmtree(evicted, ignore_errors=True)
+            logger.info(f"Evicted docking run directory {evicted}; its pose file is no longer available.")
+
+
+def _prepare_receptor_cached(receptor_pdb: Path, logs: List[str]) -> Path:
+    """
+    Convert a receptor PDB to PDBQT, reusing a cached copy when the source
+    file (by resolved path and modification time) has been prepared before.
+    """
+    stat = receptor_pdb.stat()
+    key = hashlib.sha256(f"{receptor_pdb.resolve()}:{stat.st_mtime_ns}".encode()).hexdigest()[:16]
+    receptor_pdbqt = RECEPTOR_CACHE_DIR / f"receptor_{key}.pdbqt"
+    if receptor_pdbqt.exists():
+        logs.append(f"Using cached receptor PDBQT: {receptor_pdbqt}")
+        return receptor_pdbqt
+
+    RECEPTOR_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    # Write to a unique file and rename so concurrent runs never see partial output
+    tmp_pdbqt = RECEPTOR_CACHE_DIR / f"receptor_{key}.{uuid.uuid4().hex}.pdbqt"
+    cmd_prep_rec = [
+        "prepare_receptor", "-r", str(receptor_pdb), "-o", str(tmp_pdbqt)
+    ]
+    logs.append(f"Running receptor preparation: {' '.join(cmd_prep_rec)}")
+    try:
+        subprocess.run(cmd_prep_rec, check=True, capture_output=True)
+        tmp_pdbqt.replace(receptor_pdbqt)
+    finally:
+        tmp_pdbqt.unlink(missing_ok=True)
+    logs.append(f"Receptor PDBQT generated and cached: {receptor_pdbqt}")
+    return receptor_pdbqt
+
+
+def _ligand_pdbqt_from_smiles(smiles: str) -> str:
+    """Build a 3D ligand from SMILES and return it as a PDBQT string via Meeko."""
+    mol = Chem.MolFromSmiles(smiles)
+    if mol is None:
+        raise ValueError(f"Could not parse ligand SMILES: {smiles}")
+    mol_h = Chem.AddHs(mol)
+    if AllChem.EmbedMolecule(mol_h, AllChem.ETKDGv3()) != 0:
+        raise ValueError(f"Could not embed 3D coordinates for ligand: {smiles}")
+    setups = MoleculePreparation().prepare(mol_h)
+    pdbqt_string, is_ok, error_msg = PDBQTWriterLegacy.write_string(setups[0])
+    if not is_ok:
+        raise ValueError(f"Meeko failed to write ligand PDBQT: {error_msg}")
+    return pdbqt_string
+
 
 class DockLigandInput(BaseModel):
     ligand_smiles: str = Field(..., description="Ligand structure in SMILES format")
     receptor_pdb_path: str = Field(..., description="Path to the target protein PDB file")
-    center_x: float = Field(None, description="X coordinate of docking box center")
-    center_y: float = Field(None, description="Y coordinate of docking box center")
-    center_z: float = Field(None, description="Z coordinate of docking box center")
+    center_x: Optional[float] = Field(None, description="X coordinate of docking box center")
+    center_y: Optional[float] = Field(None, description="Y coordinate of docking box center")
+    center_z: Optional[float] = Field(None, description="Z coordinate of docking box center")
     size_x: float = Field(20.0, description="Size of docking box along X axis")
     size_y: float = Field(20.0, description="Size of docking box along Y axis")
     size_z: float = Field(20.0, description="Size of docking box along Z axis")
     exhaustiveness: int = Field(8, description="Exhaustiveness of the global search (higher is slower)")
     num_modes: int = Field(9, description="Maximum number of binding modes to generate")
+    backend: Literal['vina', 'unidock'] = Field(
+        'vina', description="Docking engine: 'vina' (CPU, all cores) or 'unidock' (GPU-accelerated Uni-Dock)"
+    )
 
-    @validator('receptor_pdb_path')
+    @field_validator('receptor_pdb_path')
+    @classmethod
     def check_receptor_exists(cls, v: str) -> str:
         if not Path(v).exists():
             raise ValueError(f"Receptor file not found: {v}")
@@ -33,82 +188,38 @@ class DockLigandInput(BaseModel):
 
 class DockLigandOutput(BaseModel):
     top_score: float = Field(..., description="Best docking affinity score (kcal/mol)")
-    pose_output_path: str = Field(..., description="Path to the PDBQT file of the top-scoring pose")
+    pose_output_path: str = Field(
+        ..., description="Path to the PDBQT file of the top-scoring pose (kept for the most recent runs only)"
+    )
     logs: List[str] = Field(..., description="Step-by-step execution logs for LLMs")
 
 
 class DockLigandTool(MCPTool):
     name = "dock_ligand"
-    description = "Dock a ligand into a protein using AutoDock Vina via command line."
+    description = "Dock a ligand into a protein using AutoDock Vina."
     input_schema = DockLigandInput
     output_schema = DockLigandOutput
 
     def run(self, input_data: DockLigandInput) -> Dict[str, Any]:
         logs: List[str] = []
+        workdir: Optional[Path] = None
         try:
             # Prepare temporary working directory
-            workdir = Path(tempfile.mkdtemp(prefix="vina_"))
+            workdir = _new_workdir()
             logs.append(f"Created working directory: {workdir}")
 
-            # Prepare receptor: convert PDB to PDBQT
-            receptor_pdb = Path(input_data.receptor_pdb_path)
-            receptor_pdbqt = workdir / (receptor_pdb.stem + ".pdbqt")
-            cmd_prep_rec = [
-                "prepare_receptor", "-r", str(receptor_pdb), "-o", str(receptor_pdbqt)
-            ]
-            logs.append(f"Running receptor preparation: {' '.join(cmd_prep_rec)}")
-            subprocess.run(cmd_prep_rec, check=True, capture_output=True)
-            logs.append("Receptor PDBQT generated.")
-
-            # Prepare ligand: SMILES -> PDBQT
-            ligand_pdbqt = workdir / "ligand.pdbqt"
-            cmd_prep_lig = [
-                "prepare_ligand4", "-l", "-", "-o", str(ligand_pdbqt)
-            ]
-            logs.append(f"Running ligand preparation: {' '.join(cmd_prep_lig)}")
-            # feed SMILES via stdin
-            proc = subprocess.run(
-                cmd_prep_lig,
-                input=input_data.ligand_smiles.encode(),
-                check=True,
-                capture_output=True
-            )
-            logs.append("Ligand PDBQT generated.")
+            # Prepare receptor: convert PDB to PDBQT (cached per source file)
+            receptor_pdbqt = _prepare_receptor_cached(Path(input_data.receptor_pdb_path), logs)
+
+            # Prepare ligand in-process: SMILES -> 3D -> PDBQT
+            ligand_pdbqt = _ligand_pdbqt_from_smiles(input_data.ligand_smiles)
+            logs.append("Ligand PDBQT generated with Meeko.")
 
-            # Build Vina command
             out_poses = workdir / "out.pdbqt"
-            vina_cmd = [
-                "vina",
-                "--receptor", str(receptor_pdbqt),
-                "--ligand", str(ligand_pdbqt),
-                "--center_x", str(input_data.center_x or 0.0),
-                "--center_y", str(input_data.center_y or 0.0),
-                "--center_z", str(input_data.center_z or 0.0),
-                "--size_x", str(input_data.size_x),
-                "--size_y", str(input_data.size_y),
-                "--size_z", str(input_data.size_z),
-                "--exhaustiveness", str(input_data.exhaustiveness),
-                "--num_modes", str(input_data.num_modes),
-                "--out", str(out_poses)
-            ]
-            logs.append(f"Executing Vina: {' '.join(vina_cmd)}")
-            result = subprocess.run(vina_cmd, check=True, capture_output=True, text=True)
-            logs.extend(result.stdout.splitlines())
-
-            # Parse top score from stdout
-            top_score = None
-            for line in result.stdout.splitlines():
-                if line.strip().startswith("1 "):
-                    parts = line.split()
-                    try:
-                        top_score = float(parts[1])
-                        logs.append(f"Parsed top score: {top_score}")
-                    except Exception:
-                        logs.append(f"Failed to parse score line: {line}")
-                    break
-            if top_score is None:
-                logs.append("No docking score parsed; setting top_score to 0.0")
-                top_score = 0.0
+            if input_data.backend == 'unidock':
+                top_score = self._dock_unidock(input_data, receptor_pdbqt, ligand_pdbqt, workdir, out_poses, logs)
+            else:
+                top_score = self._dock_vina(input_data, receptor_pdbqt, ligand_pdbqt, out_poses, logs)
 
             return {
                 "top_score": top_score,
@@ -117,7 +228,7 @@ class DockLigandTool(MCPTool):
             }
 
         except subprocess.CalledProcessError as cpe:
-            err = cpe.stderr.decode() if cpe.stderr else str(cpe)
+            err = cpe.stderr.decode() if isinstance(cpe.stderr, bytes) else (cpe.stderr or str(cpe))
             errmsg = f"Subprocess failed: {err}"
             logger.exception(errmsg)
             logs.append(errmsg)
@@ -127,3 +238,81 @@ class DockLigandTool(MCPTool):
             logger.exception(errmsg)
             logs.append(errmsg)
             return {"top_score": 0.0, "pose_output_path": "", "logs": logs}
+        finally:
+            # Only finished runs become eligible for eviction
+            if workdir is not None:
+                _retire_workdir(workdir)
+
+    @staticmethod
+    def _dock_vina(
+        input_data: DockLigandInput, receptor_pdbqt: Path, ligand_pdbqt: str, out_poses: Path, logs: List[str]
+    ) -> float:
+        """Dock through the Vina Python bindings in the worker process, searching on every available core."""
+        center = [input_data.center_x or 0.0, input_data.center_y or 0.0, input_data.center_z or 0.0]
+        box_size = [input_data.size_x, input_data.size_y, input_data.size_z]
+        cpu = os.cpu_count() or 1
+        logs.append(f"Docking box: center={center}, box_size={box_size}")
+        logs.append(
+            f"Docking with exhaustiveness={input_data.exhaustiveness}, n_poses={input_data.num_modes}, cpu={cpu}"
+        )
+        try:
+            future = _vina_pool().submit(
+                _run_vina,
+                str(receptor_pdbqt),
+                ligand_pdbqt,
+                center,
+                box_size,
+                input_data.exhaustiveness,
+                input_data.num_modes,
+                str(out_poses),
+                cpu,
+            )
+            top_score = future.result()
+        except BrokenProcessPool:
+            _discard_vina_pool()
+            raise
+
+        logs.append(f"Top score: {top_score}")
+        return top_score
+
+    @staticmethod
+    def _dock_unidock(
+        input_data: DockLigandInput,
+        receptor_pdbqt: Path,
+        ligand_pdbqt: str,
+        workdir: Path,
+        out_poses: Path,
+        logs: List[str],
+    ) -> float:
+        """Dock on the GPU with the Uni-Dock CLI, which takes Vina-compatible arguments."""
+        ligand_path = workdir / "ligand.pdbqt"
+        ligand_path.write_text(ligand_pdbqt)
+        unidock_cmd = [
+            "unidock",
+            "--receptor", str(receptor_pdbqt),
+            "--ligand", str(ligand_path),
+            "--center_x", f"{input_data.center_x or 0.0:.3f}",
+            "--center_y", f"{input_data.center_y or 0.0:.3f}",
+            "--center_z", f"{input_data.center_z or 0.0:.3f}",
+            "--size_x", f"{input_data.size_x:.3f}",
+            "--size_y", f"{input_data.size_y:.3f}",
+            "--size_z", f"{input_data.size_z:.3f}",
+            "--exhaustiveness", f"{input_data.exhaustiveness}",
+            "--num_modes", f"{input_data.num_modes}",
+            "--out", str(out_poses)
+        ]
+        if logger.isEnabledFor(logging.DEBUG):
+            logs.append(f"Executing Uni-Dock: {' '.join(unidock_cmd)}")
+        else:
+            logs.append("Executing Uni-Dock.")
+        result = subprocess.run(unidock_cmd, check=True, capture_output=True, text=True)
+        logs.extend(result.stdout.splitlines()[-STDOUT_LOG_LINES:])
+
+        # Parse top score from stdout
+        match = _SCORE_RE.search(result.stdout)
+        if match is None:
+            logs.append("No docking score parsed; setting top_score to 0.0")
+            return 0.0
+        top_score = float(match.group(1))
+        logs.append(f"Parsed top score: {top_score}")
+        return top_score